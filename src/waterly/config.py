@@ -5,14 +5,14 @@
 #
 
 import os
-import pytz
 import json
 import threading
 
-from typing import Any
+from typing import Any, Callable
 from enum import StrEnum, Enum
 from datetime import datetime
 from pathlib import Path
+from zoneinfo import ZoneInfo
 from .model.units import UnitType
 from .model.zone import Zone
 
@@ -30,7 +30,7 @@ def get_project_root():
 
 #<editor-fold desc="Constants, Factory Settings">
 # local timezone of the system - updated by the weather service
-DEFAULT_TIMEZONE: pytz.BaseTzInfo = pytz.UTC
+DEFAULT_TIMEZONE: ZoneInfo = ZoneInfo("UTC")
 
 # Default location for weather (set to your coordinates, unless you happen to have a garden in the middle of the ocean, off west coast of Africa ;))
 # - use https://www.google.com/maps and copy your coordinates
@@ -73,10 +73,11 @@ class Settings(StrEnum):
     WEATHER_CHECK_INTERVAL_SECONDS = "weather_check_interval_seconds", {"value":6*3600}       # 6 hours
     WEATHER_CHECK_PRE_WATERING_SECONDS = "weather_check_pre_watering_seconds", {"value":30*60}    # 30 minutes
     WEATHER_LAST_CHECK_TIMESTAMP = "weather_last_check_timestamp", {"value":None}
+    WEATHER_FULL_WINDOW_FETCH = "weather_full_window_fetch", {"value":False}                  # fetch whole past/forecast days rather than the +/-24h horizon
     SENSOR_READ_INTERVAL_SECONDS = "sensor_read_interval_seconds", {"value":60*10}            # 10 minutes
     MINIMUM_SENSOR_HUMIDITY_PERCENT = "minimum_sensor_humidity_percent", {"Z1":30.0, "Z2":30.0, "Z3":30.0}
     TREND_MAX_SAMPLES = "trend_max_samples", {"value":3000}                                  # ~ 1 month worth of samples
-    LOCAL_TIMEZONE = "local_timezone", {"value":DEFAULT_TIMEZONE.zone}
+    LOCAL_TIMEZONE = "local_timezone", {"value":DEFAULT_TIMEZONE.key}
     LOCATION = "location", {"longitude":DEFAULT_LONGITUDE, "latitude":DEFAULT_LATITUDE}
     GARDENING_SEASON = "gardening_season", {"start": "03-31", "stop": "10-31"}  # MM-DD (inclusive)
 
@@ -127,10 +128,10 @@ def __json_datetime_decoder(obj:dict[str, str]) -> datetime | dict[str, str]:
         return obj
     # noinspection PyBroadException
     try:
-        tz = pytz.timezone(obj["tz"]) if obj["tz"] else DEFAULT_TIMEZONE
+        tz = ZoneInfo(obj["tz"]) if obj["tz"] else DEFAULT_TIMEZONE
     except Exception:
         tz = DEFAULT_TIMEZONE
-    return tz.localize(datetime.fromisoformat(obj["iso"]).replace(tzinfo=None))
+    return datetime.fromisoformat(obj["iso"]).replace(tzinfo=tz)
 
 def _json_default(o) -> dict[str, Any]:
     """
@@ -211,6 +212,7 @@ class AppConfig:
         self.settings: dict[str, Any] = DEFAULT_SETTINGS.copy()
         self._settings_file = f"{DATA_DIR}/settings.json"
         self._persist_callback = None  # injected persistence (e.g., DB) to avoid circular import
+        self._change_listeners: list[Callable[[Settings], None]] = []
 
     def __getitem__(self, arg: Settings) -> Any:
         if arg.name not in self.settings:
@@ -228,6 +230,13 @@ class AppConfig:
             except Exception:
                 # Do not let persistence failures break config assignment
                 pass
+        for listener in self._change_listeners:
+            # noinspection PyBroadException
+            try:
+                listener(arg)
+            except Exception:
+                # Do not let listener failures break config assignment
+                pass
 
     def save_to_file(self):
         os.makedirs(os.path.dirname(self._settings_file), exist_ok=True)
@@ -249,11 +258,19 @@ class AppConfig:
         with self._lock:
             self._persist_callback = callback
 
+    def add_change_listener(self, listener: Callable[[Settings], None]):
+        """
+        Register a listener with signature (setting: Settings) -> None, invoked after a setting is assigned. Allows
+        consumers to cache values derived from the settings and refresh them only when they change.
+        """
+        with self._lock:
+            self._change_listeners = [*self._change_listeners, listener]
+
     @staticmethod
     def __unmarshal__(arg: Settings, value: dict[str, Any]) -> Any:
         match arg:
             case Settings.LOCAL_TIMEZONE:
-                return pytz.timezone(value["value"])
+                return ZoneInfo(value["value"])
             case _:
                 if "value" in value:
                     return value["value"]
@@ -266,8 +283,8 @@ class AppConfig:
     def __marshal__(arg: Settings, value: Any) -> dict[str, Any]:
         match arg:
             case Settings.LOCAL_TIMEZONE:
-                if isinstance(value, pytz.BaseTzInfo):
-                    return {"value": value.zone}
+                if isinstance(value, ZoneInfo):
+                    return {"value": value.key}
                 elif isinstance(value, dict):
                     return value
                 else:
@@ -94,12 +94,20 @@ def write_text_file(path: str, content: str) -> None:
     Uses a temporary file + atomic replace to avoid partial writes.
     Creates parent directories if they don't exist.
     """
+    write_bytes_file(path, content.encode("utf-8"))
+
+def write_bytes_file(path: str, content: bytes) -> None:
+    """
+    Write the given bytes to 'path', overwriting if it exists.
+    Uses a temporary file + atomic replace to avoid partial writes.
+    Creates parent directories if they don't exist.
+    """
     # Ensure parent directory exists
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
     tmp_path = f"{path}.tmp"
     try:
-        with open(tmp_path, "w", encoding="utf-8") as f:
+        with open(tmp_path, "wb") as f:
             f.write(content)
         # Atomic on POSIX; safe overwrite on Windows
         os.replace(tmp_path, path)
@@ -3,8 +3,8 @@
 #  Copyright (c) 2025 by Dan Luca. All rights reserved.
 #
 
-import pytz
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from ..config import CONFIG, Settings
 
 def _json_datetime_encoder(dt:datetime) -> dict[str, str]:
@@ -44,7 +44,7 @@ def _json_datetime_decoder(obj:dict[str, str]) -> datetime | dict[str, str]:
         return obj
     # noinspection PyBroadException
     try:
-        tz = pytz.timezone(obj["tz"]) if obj["tz"] else CONFIG[Settings.LOCAL_TIMEZONE]
+        tz = ZoneInfo(obj["tz"]) if obj["tz"] else CONFIG[Settings.LOCAL_TIMEZONE]
     except Exception:
         tz = CONFIG[Settings.LOCAL_TIMEZONE]
-    return tz.localize(datetime.fromisoformat(obj["iso"]).replace(tzinfo=None))
\ No newline at end of file
+    return datetime.fromisoformat(obj["iso"]).replace(tzinfo=tz)
\ No newline at end of file
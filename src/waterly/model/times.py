@@ -3,18 +3,30 @@
 #  Copyright (c) 2025 by Dan Luca. All rights reserved.
 #
 from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import pytz
 import logging
 from ..config import DEFAULT_TIMEZONE, CONFIG, Settings
 
-def valid_timezone(tz: str) -> pytz.BaseTzInfo:
+@lru_cache(maxsize=16)
+def valid_timezone(tz: str) -> ZoneInfo:
+    """
+    Resolves a timezone name, falling back to the default timezone when the name is not valid. The resolutions are
+    memoized by name - a handful of names are resolved for every weather update and sensor reading; an invalid name
+    is only reported once.
+
+    :param tz: The IANA timezone name, e.g. America/Chicago
+    :type tz: str
+    :return: The timezone.
+    :rtype: ZoneInfo
+    """
     logger = logging.getLogger(__name__)
     try:
-        timezone = pytz.timezone(tz or "UTC")
-    except pytz.UnknownTimeZoneError:
+        timezone = ZoneInfo(tz or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
         timezone = DEFAULT_TIMEZONE
-        logger.warning(f"Invalid timezone '{tz}' for pytz/TZDB version {pytz.VERSION}. Using default timezone {DEFAULT_TIMEZONE} instead.")
+        logger.warning(f"Invalid timezone '{tz}' for the TZDB. Using default timezone {DEFAULT_TIMEZONE} instead.")
     return timezone
 
 
@@ -2,10 +2,12 @@
 #
 #  Copyright (c) 2025 by Dan Luca. All rights reserved.
 #
-# from dataclasses import dataclass
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+import numpy as np
+
 from .measurement import Measurement
 from .units import Unit
 
@@ -20,6 +22,8 @@ class WeatherData:
 
     :ivar _timestamp: The timestamp associated with the weather data.
     :type _timestamp: datetime
+    :ivar _epoch: The timestamp as UTC epoch seconds, computed once for sorting and storage.
+    :type _epoch: float
     :ivar _temperature: The temperature recorded at the given timestamp.
     :type _temperature: Measurement
     :ivar _soil_humidity: Soil humidity expressed as a percentage (m³/m³).
@@ -31,10 +35,14 @@ class WeatherData:
     :ivar _surface_pressure: Surface pressure at the given timestamp.
     :type _surface_pressure: Measurement|None
     """
+    __slots__ = ("_timestamp", "_epoch", "_tag", "_temperature", "_soil_humidity", "_precipitation_amount",
+                 "_precipitation_prob", "_surface_pressure")
+
     def __init__(self, timestamp: datetime, tag: str, temperature: Measurement, soil_humidity: Measurement,
                  precipitation_amount: Measurement, precipitation_prob: Optional[Measurement]=None,
                  surface_pressure: Optional[Measurement]=None):
         self._timestamp = timestamp # local time
+        self._epoch = timestamp.timestamp()
         self._tag = tag
         self._temperature = temperature
         self._soil_humidity = soil_humidity
@@ -42,26 +50,6 @@ class WeatherData:
         self._precipitation_prob = precipitation_prob   # percentage
         self._surface_pressure = surface_pressure
 
-    @classmethod
-    def from_db_row(cls, row: tuple) -> "WeatherData":
-        """
-        Build from a DB row that matches the SELECT in storage.get_weather_data:
-        SELECT collected_at_utc, forecast_ts_utc, tz, tag, temperature_2m, temperature_unit,
-               soil_moisture_1_to_3cm, moisture_unit, precipitation, precipitation_unit,
-               precipitation_probability, surface_pressure, pressure_unit
-        """
-        # row[0] is forecast timestamp - caller must already localize the timestamp (see storage.get_weather_data).
-        # Here we only positionally map values to WeatherData constructor.
-        return cls(
-            timestamp=row[0],  # the caller should pass the localized datetime in place of row[0] (see storage)
-            tag=row[1],
-            temperature=Measurement(row[2],row[3]),
-            soil_humidity=Measurement(row[4],row[5]),
-            precipitation_amount=Measurement(row[6],row[7]),
-            precipitation_prob=Measurement(row[8], Unit.PERCENT),
-            surface_pressure=Measurement(row[9],row[10])
-        )
-
     @classmethod
     def from_api_current(cls, ts: datetime, current: dict, units: dict) -> "WeatherData":
         """
@@ -77,17 +65,17 @@ class WeatherData:
         )
 
     @classmethod
-    def from_api_hourly(cls, ts: datetime, tag: str, deg: float, soil: float, precip: float, prob: float, units: dict,
-                        pressure: Optional[Measurement] = None) -> "WeatherData":
+    def from_api_hourly(cls, ts: datetime, tag: str, deg: float, soil: float, precip: float, prob: float,
+                        temp_unit: str, soil_unit: str, precip_unit: str, pressure: Optional[Measurement] = None) -> "WeatherData":
         """
-        Build from Open-Meteo hourly arrays and hourly_units.
+        Build from Open-Meteo hourly arrays; the units are the hourly_units values, looked up once per response.
         """
         return cls(
             timestamp=ts,
             tag=tag,
-            temperature=Measurement(deg, units.get("temperature_2m")),
-            soil_humidity=Measurement(soil, units.get("soil_moisture_1_to_3cm")),
-            precipitation_amount=Measurement(precip, units.get("precipitation")),
+            temperature=Measurement(deg, temp_unit),
+            soil_humidity=Measurement(soil, soil_unit),
+            precipitation_amount=Measurement(precip, precip_unit),
             precipitation_prob=Measurement(prob, Unit.PERCENT),
             surface_pressure=pressure
         )
@@ -96,6 +84,10 @@ class WeatherData:
     def timestamp(self) -> datetime:
         return self._timestamp
 
+    @property
+    def epoch(self) -> float:
+        return self._epoch
+
     @property
     def tag(self) -> str:
         return self._tag
@@ -127,3 +119,48 @@ class WeatherData:
     def __repr__(self):
         return self.__str__()
 
+
+
+@dataclass(frozen=True, slots=True)
+class WeatherSeries:
+    """
+    Structure-of-arrays view over a run of hourly weather records, ordered by forecast time.
+
+    Aggregations over a forecast window (sums, averages, maximums) are computed as NumPy reductions
+    over these arrays instead of iterating WeatherData objects.
+
+    Attributes:
+        ts: Forecast timestamps as UTC epoch seconds (int64).
+        precip: Precipitation amounts, in precip_unit (float32).
+        prob: Precipitation probabilities, as percentage (float32).
+        soil: Soil humidity at 1-3cm, in m³/m³ (float32).
+        precip_unit: The unit of the precipitation amounts, None when the series is empty.
+    """
+    ts: np.ndarray
+    precip: np.ndarray
+    prob: np.ndarray
+    soil: np.ndarray
+    precip_unit: Optional[Unit] = None
+
+    @classmethod
+    def from_weather_data(cls, data: list[WeatherData]) -> "WeatherSeries":
+        """
+        Build from WeatherData objects, keeping only the forecast records (with a precipitation probability value), in
+        chronological order - the same records storage.get_weather_data selects from the database.
+        """
+        forecast = sorted((w for w in data if w.precipitation_prob is not None and w.precipitation_prob.value is not None),
+                          key=lambda w: w.epoch)
+        n = len(forecast)
+        return cls(
+            ts=np.fromiter((w.epoch for w in forecast), dtype=np.int64, count=n),
+            precip=np.fromiter((w.precipitation_amount.value for w in forecast), dtype=np.float32, count=n),
+            prob=np.fromiter((w.precipitation_prob.value for w in forecast), dtype=np.float32, count=n),
+            soil=np.fromiter((w.soil_humidity.value for w in forecast), dtype=np.float32, count=n),
+            precip_unit=forecast[-1].precipitation_amount.unit if forecast else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __getitem__(self, item: slice) -> "WeatherSeries":
+        return WeatherSeries(self.ts[item], self.precip[item], self.prob[item], self.soil[item], self.precip_unit)
@@ -142,7 +142,7 @@ class WateringManager:
                         continue
                     # Decide if we cancel due to weather or already on target humidity
                     has_drought = any(patch.has_drought() for patch in self.patches)
-                    should_water = self.weather.should_water_garden() or has_drought
+                    should_water = self.weather.should_water_garden(now) or has_drought
                     if should_water:
                         self._logger.info("Weather data enables watering")
                         self._perform_watering(self._max_minutes)
@@ -9,26 +9,56 @@ import sqlite3
 import hashlib
 import logging
 import re
+import threading
+import numpy as np
+
 from contextlib import contextmanager
 from datetime import datetime, UTC
 from typing import Any
 
 from .config import get_project_root, Settings, CONFIG, RPI_ZONE_NAME, ZONES, AppConfig
 from .model.measurement import Measurement, WateringMeasurement
-from .model.times import valid_timezone
 from .model.trend import TrendName
 from .model.units import Unit, UnitType
-from .model.weather_data import WeatherData
+from .model.weather_data import WeatherData, WeatherSeries
 from .model.zone import Zone
 
 __db_file_name = f"{get_project_root()}/data/waterly-{datetime.now().year}.sqlite"
+RECENT_WEATHER_HOURS = 72
+# forecast records of the recent weather updates, kept in memory to serve get_weather_data without a database round-trip;
+# replaced as a whole (never mutated) by record_weather, hence readers can use the reference without locking
+_recent_weather: WeatherSeries | None = None
+# incremented on every measurement or weather write - readers caching views derived from the data compare it
+_data_version: int = 0
+# measurements and weather are recorded from several threads (sensors, scheduler, weather) - increments must not be lost
+_data_version_lock = threading.Lock()
+# per-thread database connections, keyed by file path; opened on first use and kept for the life of the thread
+_connections = threading.local()
+DB_MMAP_SIZE = 256 * 1024 * 1024
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    """
+    Opens a SQLite connection in autocommit mode, set up for the WAL journal with memory-mapped reads.
+
+    :param path: File path to the SQLite database.
+    :type path: str
+    :return: The new connection.
+    :rtype: sqlite3.Connection
+    """
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None)  # autocommit
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    return conn
 
 @contextmanager
 def db(path=__db_file_name):
     """
-    Context manager for managing a SQLite database connection. This context manager provides
+    Context manager for accessing a SQLite database connection. This context manager provides
     a connection to a SQLite database identified by the given path, with autocommit mode enabled.
-    It ensures that the connection is properly closed when exiting the context.
+    The connection is opened once per thread and reused by subsequent calls from the same thread,
+    sparing the file open and journal probe of a new connection on every call. A transaction left
+    open by a failing block is rolled back when exiting the context.
 
     :param path: Optional; File path to the SQLite database. Defaults to a path named
         "<project_root>/data/waterly-<current_year>.sqlite".
@@ -36,11 +66,17 @@ def db(path=__db_file_name):
     :return: A SQLite connection object that can be used within the context.
     :rtype: sqlite3.Connection
     """
-    conn = sqlite3.connect(path, timeout=10, isolation_level=None)  # autocommit
+    pool: dict[str, sqlite3.Connection] | None = getattr(_connections, "pool", None)
+    if pool is None:
+        pool = _connections.pool = {}
+    conn = pool.get(path)
+    if conn is None:
+        conn = pool[path] = _open_connection(path)
     try:
         yield conn
     finally:
-        conn.close()
+        if conn.in_transaction:
+            conn.rollback()
 
 def get_db_version(conn) -> tuple[str, str]:
     """
@@ -213,6 +249,21 @@ def save_config_item(item: Settings, value: dict[str, Any]):
         cur.execute("UPDATE config SET value=? WHERE type=?", (json.dumps(value), item.name))
         conn.commit()
 
+def _bump_data_version():
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+
+def data_version() -> int:
+    """
+    Retrieves the version of the recorded data - it changes whenever measurements or weather data are recorded.
+    Allows callers to cache views derived from the data and refresh them only when the data changed.
+
+    :return: The current data version.
+    :rtype: int
+    """
+    return _data_version
+
 def get_zones_from_db() -> dict[int, Zone]:
     """
     Fetches zone data from the database and populates it into the ZONES dictionary.
@@ -251,6 +302,7 @@ def __add_measurement(trend: str, zone: str, measurement: Measurement):
             (trend, zone_id[0], int(measurement.timestamp.timestamp() * 1000), str(measurement.timestamp.tzinfo),
              measurement.value, measurement.unit))
         conn.commit()
+    _bump_data_version()
 
 def record_measurement(trend: TrendName, zone: str, measurement: Measurement, unit: Unit = None):
     """
@@ -296,17 +348,20 @@ def record_watering(zone: str, measurement: WateringMeasurement):
     """
     record_measurement(TrendName.WATER, zone, measurement)
 
-def record_weather(weather_data: list[WeatherData]):
+def record_weather(weather_data: list[WeatherData]) -> WeatherSeries:
     """
     Records weather data into a database.
 
     This function takes a list of weather data and stores the relevant information
     to a database. It includes details about the current conditions and forecasts,
     such as temperature, precipitation, soil moisture, and surface pressure.
+    The forecast records are also merged into the in-memory recent weather records (last RECENT_WEATHER_HOURS hours),
+    which get_weather_data serves first.
 
     :param weather_data: A list of WeatherData objects containing the weather details to be recorded.
     :type weather_data: list[WeatherData]
-    :return: None
+    :return: The forecast records recorded, as a `WeatherSeries` of arrays in chronological order.
+    :rtype: WeatherSeries
     """
     with db() as conn:
         cur = conn.cursor()
@@ -316,13 +371,69 @@ def record_weather(weather_data: list[WeatherData]):
             cur.execute("""
               INSERT OR REPLACE INTO weather(collected_at_utc, forecast_ts_utc, tz, tag, temperature_2m, temperature_unit, precipitation_probability, precipitation, precipitation_unit, soil_moisture_1_to_3cm, moisture_unit, surface_pressure, pressure_unit)
                 VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-            """, (now, wd.timestamp.timestamp() * 1000, str(wd.timestamp.tzinfo),
+            """, (now, wd.epoch * 1000, str(wd.timestamp.tzinfo),
                   wd.tag, wd.temperature.value, wd.temperature.unit, wd.precipitation_prob.value if wd.precipitation_prob else None,
                   wd.precipitation_amount.value, wd.precipitation_amount.unit, wd.soil_humidity.value, wd.soil_humidity.unit,
                   wd.surface_pressure.value if wd.surface_pressure else None, wd.surface_pressure.unit if wd.surface_pressure else None))
         conn.commit()
+    _bump_data_version()
+    series = WeatherSeries.from_weather_data(weather_data)
+    _merge_recent_weather(series)
+    return series
+
+def _merge_recent_weather(series: WeatherSeries):
+    """
+    Merges newly recorded forecast records into the in-memory recent weather records. The new records replace the
+    existing ones with the same forecast time - same as the INSERT OR REPLACE into the database; records older than
+    RECENT_WEATHER_HOURS before the latest one are dropped.
+
+    :param series: The newly recorded forecast records.
+    :type series: WeatherSeries
+    """
+    global _recent_weather
+    if not series:
+        return
+    old = _recent_weather
+    if old is not None and old.precip_unit == series.precip_unit:
+        keep = ~np.isin(old.ts, series.ts)
+        ts = np.concatenate((old.ts[keep], series.ts))
+        order = np.argsort(ts, kind="stable")
+        merged = WeatherSeries(ts[order], np.concatenate((old.precip[keep], series.precip))[order],
+                               np.concatenate((old.prob[keep], series.prob))[order],
+                               np.concatenate((old.soil[keep], series.soil))[order], series.precip_unit)
+    else:
+        merged = series
+    start = int(np.searchsorted(merged.ts, merged.ts[-1] - RECENT_WEATHER_HOURS * 3600, side="left"))
+    _recent_weather = merged[start:]
+
+def _get_recent_weather_data(from_ts: datetime, count: int) -> WeatherSeries | None:
+    """
+    Selects the weather data from the in-memory recent weather records - same selection as get_weather_data.
+
+    :param from_ts: The reference datetime from which the weather data should be fetched.
+    :param count: The number of weather records to retrieve, positive forward in time, negative backward in time.
+    :return: The weather data entries in chronological order, or None when the recent records do not cover the
+        selection and the database must be queried.
+    :rtype: WeatherSeries | None
+    """
+    recent = _recent_weather
+    if not recent:
+        return None
+    ts = from_ts.timestamp()
+    if not recent.ts[0] <= ts <= recent.ts[-1]:
+        # the database may have records outside the recent range (e.g. from before a restart)
+        return None
+    if count > 0:
+        start = int(np.searchsorted(recent.ts, ts, side="left"))
+        end = start + count
+    else:
+        end = int(np.searchsorted(recent.ts, ts, side="right"))
+        start = end + count
+    if start < 0 or end > len(recent):
+        return None
+    return recent[start:end]
 
-def get_weather_data(from_ts: datetime, count: int) -> list[WeatherData]:
+def get_weather_data(from_ts: datetime, count: int) -> WeatherSeries:
     """
     Retrieves weather forecast data either in forward or reverse temporal order based on the
     provided time.
@@ -333,15 +444,18 @@ def get_weather_data(from_ts: datetime, count: int) -> list[WeatherData]:
     :param from_ts: The reference datetime from which the weather data should be fetched.
     :param count: The number of weather records to retrieve. A positive value fetches
         records moving forward in time. A negative value fetches records moving backward in time.
-    :return: A list containing weather data entries encapsulated in `WeatherData` objects.
+    :return: The weather data entries as a `WeatherSeries` of arrays, in chronological order.
     """
+    recent = _get_recent_weather_data(from_ts, count)
+    if recent is not None:
+        return recent
     with db() as conn:
         cur = conn.cursor()
         how_many:int = abs(count)
         forward:bool = count > 0
         if forward:
             cur.execute("""
-              SELECT collected_at_utc, forecast_ts_utc, tz, tag, temperature_2m, temperature_unit, soil_moisture_1_to_3cm, moisture_unit, precipitation, precipitation_unit, precipitation_probability, surface_pressure, pressure_unit
+              SELECT forecast_ts_utc, precipitation, precipitation_unit, precipitation_probability, soil_moisture_1_to_3cm
                 FROM weather
                WHERE forecast_ts_utc >= ? and precipitation_probability is not null
             ORDER BY forecast_ts_utc
@@ -349,16 +463,19 @@ def get_weather_data(from_ts: datetime, count: int) -> list[WeatherData]:
             """, (from_ts.timestamp() * 1000, how_many))
         else:
             cur.execute("""
-              SELECT collected_at_utc, forecast_ts_utc, tz, tag, temperature_2m, temperature_unit, soil_moisture_1_to_3cm, moisture_unit, precipitation, precipitation_unit, precipitation_probability, surface_pressure, pressure_unit
+              SELECT forecast_ts_utc, precipitation, precipitation_unit, precipitation_probability, soil_moisture_1_to_3cm
                 FROM weather
                WHERE forecast_ts_utc <= ? and precipitation_probability is not null
             ORDER BY forecast_ts_utc DESC
                LIMIT ?
             """, (from_ts.timestamp() * 1000, how_many))
         rows = cur.fetchall()
-        wdata:list = []
-        for row in rows:
-            # Build localized timestamp, then use a factory for clarity.
-            localized_ts = datetime.fromtimestamp(row[1] / 1000, valid_timezone(row[2]))
-            wdata.append(WeatherData.from_db_row((localized_ts, *row[3:])))
-        return wdata
+        if not forward:
+            rows.reverse()
+        return WeatherSeries(
+            ts=np.array([row[0] // 1000 for row in rows], dtype=np.int64),
+            precip=np.array([row[1] for row in rows], dtype=np.float32),
+            prob=np.array([row[3] for row in rows], dtype=np.float32),
+            soil=np.array([row[4] for row in rows], dtype=np.float32),
+            precip_unit=rows[-1][2] if rows else None
+        )
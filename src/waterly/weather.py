@@ -3,22 +3,165 @@
 #  Copyright (c) 2025 by Dan Luca. All rights reserved.
 #
 
+import json
+import queue
 import threading
-import pytz
+import time
 import logging
 import requests
+import numpy as np
 
-from datetime import datetime, timedelta, tzinfo
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo, UTC
 from typing import Optional
+from zoneinfo import ZoneInfo
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .config import DATA_DIR, CONFIG, Settings
 from .model.measurement import convert_measurement
 from .model.times import valid_timezone
-from .model.weather_data import WeatherData
+from .model.weather_data import WeatherData, WeatherSeries
 from .model.units import Unit, UnitType
 from .storage import record_weather, get_weather_data
-from .json.serialization import write_text_file
+from .json.serialization import write_bytes_file
+
+try:
+    import orjson
+except ImportError:     # optional, faster JSON decoding; fall back to the standard library decoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:     # optional, smaller responses; urllib3 decodes Brotli only when the module is installed
+    brotli = None
 
 OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+OPEN_METEO_TIMEOUT = (5, 20)    # (connect, read) seconds
+WEATHER_LATEST_FILE = f"{DATA_DIR}/weather-latest.json"
+
+
+def _create_session() -> requests.Session:
+    """
+    Creates the HTTP session used for the Open-Meteo API calls. The session keeps the connection to the API host
+    alive between weather updates (no DNS lookup and TLS handshake per update), requests Brotli (when available) or
+    gzip compressed responses and retries transient failures with an exponential backoff.
+
+    :return: The configured HTTP session.
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "br, gzip" if brotli else "gzip", "User-Agent": "waterly/1.0"})
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=retries))
+    return session
+
+
+def _parse_ts(s: str, tz: tzinfo) -> datetime:
+    """
+    Parses an Open-Meteo ISO timestamp (local time when requested with timezone=auto) into a timezone aware datetime.
+
+    :param s: The ISO timestamp, e.g. "2025-01-15T14:00".
+    :type s: str
+    :param tz: The timezone the timestamp is expressed in.
+    :type tz: tzinfo
+    :return: The localized datetime.
+    :rtype: datetime
+    """
+    return datetime.fromisoformat(s).replace(tzinfo=tz)
+
+
+def _local_times(times: list) -> Optional[np.ndarray]:
+    """
+    Parses the hourly times of a weather response in one batch.
+
+    :param times: The ISO-8601 local times, e.g. 2025-08-01T14:00
+    :type times: list
+    :return: The times as datetime64[m] array, or None if any of them is malformed or missing.
+    :rtype: np.ndarray | None
+    """
+    try:
+        times_local = np.array(times, dtype="datetime64[m]")
+    except (ValueError, TypeError):
+        return None
+    return None if np.isnat(times_local).any() else times_local
+
+
+def _valid_time(t) -> bool:
+    """
+    Checks a single hourly time of a weather response.
+
+    :param t: The ISO-8601 local time.
+    :return: True if the time can be parsed, False otherwise.
+    :rtype: bool
+    """
+    # noinspection PyBroadException
+    try:
+        _parse_ts(t, UTC)
+        return True
+    except Exception:
+        return False
+
+
+def _split_window(series: WeatherSeries, now_ts: float, hours: int = 12) -> tuple[WeatherSeries, WeatherSeries]:
+    """
+    Selects the hourly records of the past and next windows around the given time - the records at or before the time,
+    respectively at or after it, up to the given count each. Same selection as storage.get_weather_data.
+
+    :param series: The hourly records, in chronological order.
+    :type series: WeatherSeries
+    :param now_ts: The reference time, as epoch seconds.
+    :type now_ts: float
+    :param hours: The number of hourly records of each window.
+    :type hours: int
+    :return: The past and next window records.
+    :rtype: tuple[WeatherSeries, WeatherSeries]
+    """
+    past_end = int(np.searchsorted(series.ts, now_ts, side="right"))
+    future_start = int(np.searchsorted(series.ts, now_ts, side="left"))
+    return series[max(0, past_end - hours):past_end], series[future_start:future_start + hours]
+
+
+def _aggregate_window(past: WeatherSeries, future: WeatherSeries) -> tuple[float, float, float]:
+    """
+    Aggregates the precipitation of the past and next windows. Missing values (null in the API response or the
+    database, NaN in the series) are left out of the aggregates - and logged - rather than turning them into NaN,
+    which would fail every threshold comparison.
+
+    :param past: The past window records.
+    :type past: WeatherSeries
+    :param future: The next window records.
+    :type future: WeatherSeries
+    :return: The past rain amount, the next maximum rain probability and the next rain amount; 0 for empty windows.
+    :rtype: tuple[float, float, float]
+    """
+    missing_precip = int(np.isnan(past.precip).sum() + np.isnan(future.precip).sum())
+    missing_prob = int(np.isnan(future.prob).sum())
+    if missing_precip or missing_prob:
+        logging.getLogger(__name__).warning(f"Weather data has {missing_precip} missing precipitation amounts and {missing_prob} missing "
+                                            f"precipitation probabilities in the 12h windows; aggregating the available values")
+    return float(np.nansum(past.precip)), float(np.nanmax(future.prob, initial=0.0)), float(np.nansum(future.precip))
+
+
+def _mean(values: np.ndarray) -> float:
+    """
+    Averages the available values, leaving out the missing ones (NaN).
+
+    :param values: The values to average.
+    :type values: np.ndarray
+    :return: The average of the available values; 0 when there are none.
+    :rtype: float
+    """
+    valid = values[~np.isnan(values)]
+    return float(valid.mean()) if len(valid) > 0 else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class _WeatherSnapshot:
+    """
+    The weather service state shared with other threads - replaced as a whole by each update, never mutated.
+    """
+    last_update: Optional[datetime]
+    timezone: ZoneInfo
 
 
 class WeatherService:
@@ -34,23 +177,120 @@ class WeatherService:
     :ivar _forecast_days: The number of forecast days requested from the weather API. Hardcoded as 3 for now.
     :type _forecast_days: int
     :ivar _timezone: The timezone of the weather data, determined from the API response or set to a default.
-    :type _timezone: pytz.BaseTzInfo
+    :type _timezone: ZoneInfo
     :ivar _last_update: The timestamp of the last successful weather data update.
     :type _last_update: datetime | None
     """
     RAIN_12H_THRESHOLD_INCHES = 0.02    # an approximated 1.5 inches of rain per week means 0.1 inch per 12-hour interval; however, rain of 0.02 inches is enough from experience
+    POLL_THRESHOLD_BAND = 10.0          # rain probability percentage points around the cancellation threshold
+    POLL_STEADY_DELTA = 5.0             # rain probability change, percentage points, below which the forecast is steady
+    POLL_BACKOFF_MAX = 8                # maximum multiple of the weather check interval between updates
+    POLL_INTERVAL_MIN_SECONDS = 300     # shortest interval between updates
 
     def __init__(self):
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
+        self._session = _create_session()
         self._forecast_days: int = 3    # hardcoded for now using a common sense value
         self._past_days: int = 1        # number of past days to consider for weather data
-        self._timezone: pytz.BaseTzInfo = CONFIG[Settings.LOCAL_TIMEZONE]
+        self._timezone: ZoneInfo = CONFIG[Settings.LOCAL_TIMEZONE]
         self._last_update: Optional[datetime] = CONFIG[Settings.WEATHER_LAST_CHECK_TIMESTAMP]
+        self._snapshot = _WeatherSnapshot(self._last_update, self._timezone)
         self._pre_watering_update_offset: int = CONFIG[Settings.WEATHER_CHECK_PRE_WATERING_SECONDS]
         self._precip_prob_threshold: float = CONFIG[Settings.RAIN_CANCEL_PROBABILITY_THRESHOLD]
+        self._rain_threshold_in: float = self.RAIN_12H_THRESHOLD_INCHES
+        self._rain_threshold_mm: float = convert_measurement(self.RAIN_12H_THRESHOLD_INCHES, Unit.INCHES, Unit.MM)
+        self._watering_h, self._watering_m = self._parse_watering_time(CONFIG[Settings.WATERING_START_TIME])
+        self._watering_time: Optional[datetime] = None   # next watering time, recomputed once it has passed
+        self._check_interval: int = CONFIG[Settings.WEATHER_CHECK_INTERVAL_SECONDS]
+        self._poll_interval: int = self._check_interval  # adapted to the forecast after each update
+        self._stable_polls: int = 0                        # consecutive updates with a steady rain probability
+        self._next_prob: Optional[float] = None            # next 12h rain probability of the last update
         self._stop = threading.Event()
         self._thread = threading.Thread(target=self._run, name="WeatherService", daemon=True)
+        self._write_q: queue.Queue[Optional[tuple[str, bytes]]] = queue.Queue(maxsize=16)
+        self._writer = threading.Thread(target=self._writer_loop, name="WeatherWriter", daemon=True)
         self._logger = logging.getLogger(__name__)
+        # validators of the last response, for conditional requests with the same parameters
+        self._validated_params: Optional[dict] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._load_latest_response()
+        CONFIG.add_change_listener(self._on_config_change)
+
+    @staticmethod
+    def _parse_watering_time(value: str) -> tuple[int, int]:
+        """
+        Parses the watering start time setting.
+
+        :param value: The watering start time, formatted as HH:MM.
+        :type value: str
+        :return: The hour and minute of the watering start time.
+        :rtype: tuple[int, int]
+        :raises ValueError: If the value is not a valid time of day.
+        """
+        h, m = tuple(map(int, value.split(":")))
+        if not (0 <= h < 24 and 0 <= m < 60):
+            raise ValueError(f"{value} is not a valid time of day")
+        return h, m
+
+    def _on_config_change(self, setting: Settings):
+        """
+        Refreshes the values derived from the configuration settings when these change.
+
+        :param setting: The setting that has changed.
+        :type setting: Settings
+        """
+        if setting == Settings.WATERING_START_TIME:
+            try:
+                self._watering_h, self._watering_m = self._parse_watering_time(CONFIG[Settings.WATERING_START_TIME])
+                self._watering_time = None
+            except ValueError as e:
+                self._logger.error(f"Invalid watering start time '{CONFIG[Settings.WATERING_START_TIME]}', expected 'HH:MM'; "
+                                   f"keeping {self._watering_h:02d}:{self._watering_m:02d}: {e}")
+        elif setting == Settings.WEATHER_CHECK_INTERVAL_SECONDS:
+            self._check_interval = CONFIG[Settings.WEATHER_CHECK_INTERVAL_SECONDS]
+            self._poll_interval = self._check_interval
+            self._stable_polls = 0
+        elif setting == Settings.WEATHER_CHECK_PRE_WATERING_SECONDS:
+            self._pre_watering_update_offset = CONFIG[Settings.WEATHER_CHECK_PRE_WATERING_SECONDS]
+        elif setting == Settings.RAIN_CANCEL_PROBABILITY_THRESHOLD:
+            self._precip_prob_threshold = CONFIG[Settings.RAIN_CANCEL_PROBABILITY_THRESHOLD]
+
+    def _adapt_poll_interval(self, next_prob: float):
+        """
+        Adapts the interval between weather updates to the forecast. While the next 12h rain probability is steady
+        and far from the cancellation threshold, the interval doubles with each update, up to POLL_BACKOFF_MAX times
+        the configured interval. When the probability is close to the threshold - the watering decision could go
+        either way - the interval is halved, but no shorter than POLL_INTERVAL_MIN_SECONDS. The pre-watering window
+        update is not affected.
+
+        :param next_prob: The next 12h rain probability of the latest update, as percentage.
+        :type next_prob: float
+        """
+        prev_prob, self._next_prob = self._next_prob, next_prob
+        if abs(next_prob - self._precip_prob_threshold) <= self.POLL_THRESHOLD_BAND:
+            self._stable_polls = 0
+            self._poll_interval = max(self.POLL_INTERVAL_MIN_SECONDS, self._check_interval // 2)
+        elif prev_prob is not None and abs(next_prob - prev_prob) < self.POLL_STEADY_DELTA:
+            self._stable_polls += 1
+            self._poll_interval = self._check_interval * min(self.POLL_BACKOFF_MAX, 2 ** self._stable_polls)
+        else:
+            self._stable_polls = 0
+            self._poll_interval = self._check_interval
+
+    def _next_watering_time(self, now: datetime) -> datetime:
+        """
+        Determines the next watering time after the given time.
+
+        :param now: The reference time.
+        :type now: datetime
+        :return: The next watering time, in the timezone of the reference time.
+        :rtype: datetime
+        """
+        watering_time = now.replace(hour=self._watering_h, minute=self._watering_m, second=0, microsecond=0)
+        if watering_time < now:
+            watering_time += timedelta(days=1)
+        return watering_time
 
     def start(self):
         """
@@ -58,9 +298,11 @@ class WeatherService:
 
         The `start` method is responsible for triggering the execution of the internal
         thread managed by the instance. Once called, the thread begins its activity
-        in a separate execution flow.
+        in a separate execution flow. The writer thread persisting the raw weather
+        responses is started as well.
 
         """
+        self._writer.start()
         self._thread.start()
 
     def stop(self):
@@ -74,8 +316,11 @@ class WeatherService:
         """
         self._stop.set()
         self._thread.join(timeout=5)
+        self._write_q.put(None)     # sentinel - the writer finishes the pending writes first
+        self._writer.join(timeout=5)
+        self._session.close()
 
-    def should_water_garden(self) -> bool:
+    def should_water_garden(self, now: Optional[datetime] = None) -> bool:
         """
         Determines whether it is recommended to water the garden based on the current and past weather data
 
@@ -84,81 +329,179 @@ class WeatherService:
          - the past 12 hours have had more than 0.1 inch of rain
          - the next 12-hour rain probability is more than 50% and the amount of rain over 0.1 inch
         Otherwise, it returns true - the garden should be watered.
+        :param now: The reference time of the assessment; defaults to the current time.
+        :type now: datetime | None
         :return: True if it is recommended to water the garden, False otherwise.
         :rtype: bool
         """
-        now = datetime.now(self._timezone)
-        past_12h_data = get_weather_data(now, -12)
-        next_12h_data = get_weather_data(now, 12)
-        if not next_12h_data:
+        if now is None:
+            now = datetime.now(self._snapshot.timezone)
+        past = get_weather_data(now, -12)
+        future = get_weather_data(now, 12)
+        if not future:
             self._logger.info("Weather Data assessment: forecast data not available yet - defaulting to enable watering.")
             return True
-        past_12h_rain = 0.0
-        past_12h_soil_humidity = 0.0
-        next_12h_prob = 0.0
-        next_12h_rain = 0.0
-        next_12h_soil_humidity = 0.0
-        past_data_points = len(past_12h_data)    # hourly data points
-        future_data_points = len(next_12h_data)  # hourly data points, should have a minimum of 6
-        for w in next_12h_data:
-            past_12h_rain += w.precipitation_amount.value
-            past_12h_soil_humidity += w.soil_humidity.value
-        for w in past_12h_data:
-            next_12h_prob = max(next_12h_prob, w.precipitation_prob.value)
-            next_12h_rain += w.precipitation_amount.value
-            next_12h_soil_humidity += w.soil_humidity.value
-        precip_unit: Unit = next_12h_data[-1].precipitation_amount.unit
+        past_data_points = len(past)        # hourly data points
+        future_data_points = len(future)    # hourly data points, should have a minimum of 6
+        past_12h_rain, next_12h_prob, next_12h_rain = _aggregate_window(past, future)
+        past_12h_soil_humidity = _mean(past.soil)
+        next_12h_soil_humidity = _mean(future.soil)
+        precip_unit: Unit = future.precip_unit
         self._logger.info(f"Weather Data points: Past 12h: {past_data_points}, Future 12h: {future_data_points}")
         self._logger.info(f"Weather Data assessment: Past 12h rain: {past_12h_rain:.2f} {precip_unit}, Future 12h rain: {next_12h_rain:.2f} {precip_unit} with {next_12h_prob:.2f}% chance")
-        past_12h_soil_humidity /= past_data_points if past_data_points > 0 else 1.0
-        next_12h_soil_humidity /= future_data_points if future_data_points > 0 else 1.0
         self._logger.info(f"Weather Data assessment: Past 12h average soil humidity: {past_12h_soil_humidity*100.0:.2f}%, Future 12h average soil humidity: {next_12h_soil_humidity*100.0:.2f}%")
-        rain_12_threshold = convert_measurement(self.RAIN_12H_THRESHOLD_INCHES, Unit.INCHES, precip_unit)
+        rain_12_threshold = self._rain_threshold_mm if precip_unit == Unit.MM else self._rain_threshold_in
         should_not_water = past_12h_rain > rain_12_threshold or (next_12h_prob > self._precip_prob_threshold and next_12h_rain > rain_12_threshold)
-        return (not should_not_water) or future_data_points < 6
+        return bool(not should_not_water) or future_data_points < 6
 
     def get_last_update(self) -> Optional[datetime]:
         """
         Retrieves the last update timestamp if available. This method is thread-safe
-        and accesses the stored timestamp under a lock to ensure consistency when
-        used in a multithreaded environment.
+        and lock-free - it reads the snapshot published by the latest update.
 
         :return: The datetime object representing the last update timestamp, or None
             if no update has been recorded.
         :rtype: Optional[datetime]
         """
-        with self._lock:
-            return self._last_update
+        return self._snapshot.last_update
 
-    def get_timezone(self) -> pytz.BaseTzInfo:
+    def get_timezone(self) -> ZoneInfo:
         """
         Retrieve the timezone information.
 
-        This method fetches the timezone associated with the object. The returned
-        timezone is thread-safe and is retrieved while ensuring proper locking
-        for consistent access.
+        This method fetches the timezone associated with the object. It is thread-safe
+        and lock-free - it reads the snapshot published by the latest update.
 
         :return: The timezone information.
         :rtype: tzinfo
         """
+        return self._snapshot.timezone
+
+    def _publish_update(self, now: datetime):
+        """
+        Records a successful weather update and publishes the service state to the other threads as a new snapshot.
+        Publishing is a single attribute assignment, hence readers never see a partially updated state; the lock only
+        serializes the writers.
+
+        :param now: The time of the update.
+        :type now: datetime
+        """
         with self._lock:
-            return self._timezone
+            self._last_update = now
+            self._snapshot = _WeatherSnapshot(now, self._timezone)
+            CONFIG[Settings.WEATHER_LAST_CHECK_TIMESTAMP] = now
+
+    def _fetch(self, params: dict, headers: dict) -> Optional[requests.Response]:
+        """
+        Performs the Open-Meteo API request on a separate daemon thread, while remaining responsive to the stop signal -
+        a request with its retries can take well over a minute on a poor connection, which would otherwise hold up
+        the shutdown. An abandoned request completes (or times out) in the background.
+
+        :param params: The request parameters.
+        :type params: dict
+        :param headers: The request headers.
+        :type headers: dict
+        :return: The response, or None when the service has been stopped before the response arrived.
+        :rtype: requests.Response | None
+        :raises requests.exceptions.RequestException: For request-related failures.
+        """
+        outcome: dict = {}
+        done = threading.Event()
+
+        def fetch():
+            try:
+                outcome["response"] = self._session.get(OPEN_METEO_URL, params=params, headers=headers, timeout=OPEN_METEO_TIMEOUT)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=fetch, name="WeatherHttp", daemon=True).start()
+        while not done.wait(0.5):
+            if self._stop.is_set():
+                return None
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["response"]
+
+    def _load_latest_response(self):
+        """
+        Restores the validators (ETag, Last-Modified) of the last weather response saved by `_save_latest_response`,
+        such that the first weather update after a restart can be a conditional request as well. The weather records
+        of that response are already in the database.
+        """
+        # noinspection PyBroadException
+        try:
+            with open(WEATHER_LATEST_FILE, "rb") as f:
+                content = f.read()
+            latest = orjson.loads(content) if orjson else json.loads(content)
+            self._validated_params = latest.get("params")
+            self._etag = latest.get("etag")
+            self._last_modified = latest.get("last_modified")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self._logger.warning(f"Failed to load the latest weather response from {WEATHER_LATEST_FILE}: {e}")
+
+    def _save_latest_response(self, r: requests.Response, params: dict):
+        """
+        Keeps the validators (ETag, Last-Modified) of a weather response for conditional requests, and saves them along
+        with the request parameters to the latest weather response file. The response body is not saved there - it is
+        archived by `_save_weather_data` and its records are in the database.
+
+        :param r: The weather response.
+        :type r: requests.Response
+        :param params: The request parameters.
+        :type params: dict
+        """
+        self._validated_params = params
+        self._etag = r.headers.get("ETag")
+        self._last_modified = r.headers.get("Last-Modified")
+        meta = {"params": params, "etag": self._etag, "last_modified": self._last_modified}
+        self._queue_write(WEATHER_LATEST_FILE, json.dumps(meta).encode())
 
-    def _save_weather_data(self, data: str):
+    def _save_weather_data(self, data: bytes, now: datetime):
         """
         Saves the provided weather data to a file, indexing it by the current year and timestamp.
         The data is assumed to be in JSON format and will be stored in a structured directory
-        within the specified data directory.
+        within the specified data directory. The write itself is handed off to the writer thread,
+        such that the weather update does not wait on the disk.
 
-        :param data: Weather data to be saved. It should be in JSON format.
-        :type data: str
+        :param data: Weather data to be saved, the raw JSON response body.
+        :type data: bytes
+        :param now: The time of the weather update, used for naming the file.
+        :type now: datetime
         """
-        with self._lock:
-            # save the raw response for reference - we have other data elements of interest (precipitation, soil moisture)
-            now = datetime.now(self._timezone)
-            # index by current year
-            filename = f"{DATA_DIR}/{now.year}/weather-{now.strftime('%m%d-%H%M')}.json"
-            write_text_file(filename, data)
+        # save the raw response for reference - we have other data elements of interest (precipitation, soil moisture)
+        # index by current year
+        self._queue_write(f"{DATA_DIR}/{now.year}/weather-{now.strftime('%m%d-%H%M')}.json", data)
+
+    def _queue_write(self, filename: str, data: bytes):
+        """
+        Hands a file write off to the writer thread; the write is skipped when the writer is falling behind.
+
+        :param filename: The file to write.
+        :type filename: str
+        :param data: The file content.
+        :type data: bytes
+        """
+        try:
+            self._write_q.put_nowait((filename, data))
+        except queue.Full:
+            self._logger.warning(f"Weather data writer is falling behind; skipping saving {filename}")
+
+    def _writer_loop(self):
+        """
+        Writes the raw weather responses queued by `_save_weather_data` to disk, until the stop sentinel is received.
+
+        :return: None
+        """
+        while (item := self._write_q.get()) is not None:
+            filename, data = item
+            try:
+                write_bytes_file(filename, data)
+            except Exception as e:
+                self._logger.error(f"Failed to save weather data to {filename}: {e}", exc_info=True)
 
     def _run(self):
         """
@@ -175,23 +518,27 @@ class WeatherService:
         """
         while not self._stop.is_set():
             try:
-                now = datetime.now(self._timezone)
-                h, m = tuple(map(int, CONFIG[Settings.WATERING_START_TIME].split(":")))
-                watering_time = now.replace(hour=h, minute=m, second=0, microsecond=0)
-                if watering_time < now:
-                    watering_time += timedelta(days=1)
+                # a single clock read per iteration, shared with the weather update; the window math is done on epoch seconds
+                now_ts = time.time()
+                now = datetime.fromtimestamp(now_ts, self._timezone)
+                # the watering time only moves once a day - when it has passed, its setting or the timezone changed
+                watering_time = self._watering_time
+                if watering_time is None or now >= watering_time or watering_time.tzinfo is not now.tzinfo:
+                    watering_time = self._watering_time = self._next_watering_time(now)
+                watering_ts = watering_time.timestamp()
 
                 # Define the pre-watering window [window_start, watering_time)
-                window_start = watering_time - timedelta(seconds=self._pre_watering_update_offset)
+                window_start_ts = watering_ts - self._pre_watering_update_offset
+                last_update_ts = self._last_update.timestamp() if self._last_update else None
 
                 # Determine wait time and whether to perform an update based on window
                 pre_m, pre_s = divmod(self._pre_watering_update_offset, 60)
                 weather_check_done:bool = False
-                if now < window_start:
+                if now_ts < window_start_ts:
                     # BEFORE pre-watering window: run at regular interval, but don't overshoot the window start
-                    wait_time = min(CONFIG[Settings.WEATHER_CHECK_INTERVAL_SECONDS], max(5, int((window_start - now).total_seconds())))
+                    wait_time = min(self._poll_interval, max(5, int(window_start_ts - now_ts)))
                     # Rate-limit: skip if we updated more recently than our wait_time
-                    update_age = (now - self._last_update).total_seconds() if self._last_update else None
+                    update_age = now_ts - last_update_ts if last_update_ts is not None else None
                     if update_age is not None and update_age < wait_time:
                         wait_m, wait_s = divmod(int(wait_time), 60)
                         age_m, age_s = divmod(int(update_age), 60)
@@ -200,68 +547,105 @@ class WeatherService:
                             f"waiting time is {wait_m:d}:{wait_s:02d} min. Note the pre-watering window is {pre_m:d}:{pre_s:02d} min.")
                         # fall-through to sleep
                     else:
-                        weather_check_done = self._update_weather()
-                elif window_start <= now < watering_time:
+                        weather_check_done = self._update_weather(now)
+                        # the update may have adapted the polling interval
+                        wait_time = min(self._poll_interval, max(5, int(window_start_ts - now_ts)))
+                elif window_start_ts <= now_ts < watering_ts:
                     # INSIDE pre-watering window: allow only a single update in this window
-                    last_update_in_window = self._last_update and (self._last_update >= window_start)
+                    last_update_in_window = last_update_ts is not None and last_update_ts >= window_start_ts
                     if not last_update_in_window:
                         self._logger.info(f"Entering pre-watering window of {pre_m:02d}:{pre_s:02d} min; performing a single weather update.")
-                        weather_check_done = self._update_weather()
+                        weather_check_done = self._update_weather(now)
                     else:
                         self._logger.info(f"Pre-watering window of {pre_m:02d}:{pre_s:02d} min already updated weather at {self._last_update.strftime('%H:%M:%S')}; skipping additional updates.")
                     # Sleep until watering time to avoid repeated updates in the window
-                    wait_time = max(5, int((watering_time - now).total_seconds()))
+                    wait_time = max(5, int(watering_ts - now_ts))
                 else:
                     # Shouldn't happen because watering_time is always in the future, but be safe.
-                    wait_time = CONFIG[Settings.WEATHER_CHECK_INTERVAL_SECONDS]
+                    wait_time = self._check_interval
 
                 if weather_check_done:
                     with self._lock:
-                        if (CONFIG[Settings.LOCAL_TIMEZONE] is None) or (CONFIG[Settings.LOCAL_TIMEZONE] != self._timezone):
-                            self._logger.info(f"Local timezone changed from {CONFIG[Settings.LOCAL_TIMEZONE]} to {self._timezone}")
+                        configured_tz = CONFIG[Settings.LOCAL_TIMEZONE]
+                        if configured_tz is None or configured_tz != self._timezone:
+                            self._logger.info(f"Local timezone changed from {configured_tz} to {self._timezone}")
                             CONFIG[Settings.LOCAL_TIMEZONE] = self._timezone
             except Exception as e:
                 self._logger.error(f"Weather update failed: {e}", exc_info=True)
-                wait_time = CONFIG[Settings.WEATHER_CHECK_INTERVAL_SECONDS]
+                wait_time = self._check_interval
             self._stop.wait(wait_time)
 
-    def _update_weather(self) -> bool:
+    def _update_weather(self, now: datetime) -> bool:
         """
         Updates the current weather data by fetching information from the Open-Meteo API and calculates the probability
         of rain for the next 12 hours. The weather data is saved, and the timezone is determined based on the fetched
         information. If an invalid timezone is encountered, a default timezone is used.
         The Open-Meteo API URL can be created at https://open-meteo.com/en/docs. Example API request:
         https://api.open-meteo.com/v1/forecast?latitude=45.0341769&longitude=-93.4641572&hourly=temperature_2m,precipitation_probability,soil_moisture_1_to_3cm,precipitation&current=temperature_2m,relative_humidity_2m,precipitation,surface_pressure&timezone=auto&past_days=1&forecast_days=3&wind_speed_unit=mph&temperature_unit=fahrenheit&precipitation_unit=inch
+        Unless the WEATHER_FULL_WINDOW_FETCH setting is enabled, the past_days/forecast_days parameters are replaced with
+        past_hours/forecast_hours to only request the +/-24h horizon around the current hour.
+        A request with the same parameters as the last one is conditional (If-None-Match/If-Modified-Since); when the
+        API answers 304 Not Modified, only the update time is refreshed. The horizon parameters are relative (hours or
+        days around the current time), hence the parameters only change with the settings - location, units, horizon.
 
         :raises requests.exceptions.HTTPError: If the HTTP request returns an unsuccessful status code.
         :raises requests.exceptions.RequestException: For other request-related exceptions' response.
+        :param now: The time of the update, as captured by the caller.
+        :type now: datetime
         :return: whether the weather data was successfully updated.
         :rtype: bool
         """
         metric:bool = CONFIG[Settings.UNITS] == UnitType.METRIC
+        full_window:bool = CONFIG[Settings.WEATHER_FULL_WINDOW_FETCH]
+        location = CONFIG[Settings.LOCATION]
         params = {
-            "latitude": CONFIG[Settings.LOCATION]["latitude"],
-            "longitude": CONFIG[Settings.LOCATION]["longitude"],
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
             "hourly": "precipitation_probability,temperature_2m,precipitation,soil_moisture_1_to_3cm",
-            "forecast_days": self._forecast_days,
-            "past_days": self._past_days,
             "current": "temperature_2m,relative_humidity_2m,precipitation,surface_pressure",
             "temperature_unit": "celsius" if metric else "fahrenheit",
             "precipitation_unit": "mm" if metric else "inch",
             "timezone": "auto"  # Open-Meteo can auto-detect by coordinates
         }
+        if full_window:
+            params["forecast_days"] = self._forecast_days
+            params["past_days"] = self._past_days
+        else:
+            # request only the +/-24h horizon we consume, relative to the current hour of the location - independent of
+            # any timezone, and the same parameters on every poll; the forecast hours include the current one
+            params["past_hours"] = 24
+            params["forecast_hours"] = 25
         try:
-            r = requests.get(OPEN_METEO_URL, params=params, timeout=20)
+            headers = {}
+            if params == self._validated_params:
+                # conditional request - the API answers 304 Not Modified without a body when the data hasn't changed;
+                # the parameters hold no absolute times, so polls (and restarts) in between setting changes all match
+                if self._etag:
+                    headers["If-None-Match"] = self._etag
+                if self._last_modified:
+                    headers["If-Modified-Since"] = self._last_modified
+            r = self._fetch(params, headers)
+            if r is None:
+                self._logger.info("Weather update abandoned - the service is stopping")
+                return False
             r.raise_for_status()
-            data = r.json()
-            self._save_weather_data(r.text)
+            if r.status_code == 304:
+                self._publish_update(now)
+                self._logger.info("Weather data not modified since the last update; keeping the recorded forecast")
+                if self._next_prob is not None:
+                    self._adapt_poll_interval(self._next_prob)
+                return True
+            data = orjson.loads(r.content) if orjson else r.json()
             # determine local timezone
             self._timezone = valid_timezone(data.get("timezone", "UTC"))
-            now = datetime.now(self._timezone)
+            now = now.astimezone(self._timezone)
+            self._save_weather_data(r.content, now)
+            self._save_latest_response(r, params)
             # current conditions
             current = data.get("current", {})
             current_units = data.get("current_units", {})
-            cur_ts = self._timezone.localize(datetime.fromisoformat(current.get("time").replace("Z", "+00:00")).replace(tzinfo=None))
+            tz = self._timezone
+            cur_ts = _parse_ts(current.get("time"), tz)
             cur_weather = WeatherData.from_api_current(cur_ts, current, current_units)
             # hourly forecast data
             hourly = data.get("hourly", {})
@@ -271,49 +655,57 @@ class WeatherService:
             precip = hourly.get("precipitation", [])
             temps = hourly.get("temperature_2m", [])
             times = hourly.get("time", [])
-
-            horizon_from = now - timedelta(hours=24)
-            horizon_to = now + timedelta(hours=24)
-
-            wdata: list[WeatherData] = []
-            merged_current = False
-            for t, p, s, r, deg in zip(times, probs, soil, precip, temps):
-                # noinspection PyBroadException
-                try:
-                    ts = self._timezone.localize(datetime.fromisoformat(t.replace("Z", "+00:00")).replace(tzinfo=None))
-                except Exception:
-                    continue
-                if horizon_from <= ts <= horizon_to:
-                    if ts == cur_ts:
-                        merged_current = True
-                        wdata.append(WeatherData.from_api_hourly(ts, t, deg, s, r, p, hourly_units, cur_weather.surface_pressure))
-                    else:
-                        wdata.append(WeatherData.from_api_hourly(ts, t, deg, s, r, p, hourly_units))
+            # the rows are indexed across the columns - a missing or short column limits them to its length (as zip did)
+            n_rows = min(len(times), len(temps), len(soil), len(precip), len(probs))
+            if n_rows != len(times) or n_rows != max(len(temps), len(soil), len(precip), len(probs)):
+                self._logger.error(f"Hourly weather columns differ in length (time {len(times)}, temperature {len(temps)}, "
+                                   f"soil {len(soil)}, precipitation {len(precip)}, probability {len(probs)}); using the first {n_rows} rows")
+                times, temps, soil, precip, probs = (col[:n_rows] for col in (times, temps, soil, precip, probs))
+
+            # the hourly times are local wall-clock times, in chronological order
+            times_local = _local_times(times)
+            if times_local is None:
+                # rarely taken - drop the rows with malformed times, one at a time
+                keep = [i for i, t in enumerate(times) if _valid_time(t)]
+                self._logger.warning(f"Skipping {len(times) - len(keep)} hourly weather rows with malformed times")
+                times, temps, soil, precip, probs = ([col[i] for i in keep] for col in (times, temps, soil, precip, probs))
+                times_local = np.array(times, dtype="datetime64[m]")
+            rows = range(len(times))
+            if full_window:
+                # whole days were requested - keep only the rows within the +/-24h horizon
+                now_local = np.datetime64(now.replace(tzinfo=None), "m")
+                horizon = np.timedelta64(24, "h")
+                rows = range(int(np.searchsorted(times_local, now_local - horizon, side="left")),
+                             int(np.searchsorted(times_local, now_local + horizon, side="right")))
+            # the hourly row of the current conditions time (if any) is merged with the current conditions
+            cur_local = np.datetime64(current.get("time"), "m")
+            cur_idx = int(np.searchsorted(times_local, cur_local))
+            merged_current = cur_idx < len(times_local) and times_local[cur_idx] == cur_local
+
+            cur_pressure = cur_weather.surface_pressure if merged_current else None
+            # the parsed hourly times converted to naive datetimes in one batch, then localized - no per-row string parsing
+            naive_times: list[datetime] = times_local.tolist()
+            temp_unit = hourly_units.get("temperature_2m")
+            soil_unit = hourly_units.get("soil_moisture_1_to_3cm")
+            precip_unit = hourly_units.get("precipitation")
+            wdata: list[WeatherData] = [
+                WeatherData.from_api_hourly(naive_times[i].replace(tzinfo=tz), times[i], temps[i], soil[i], precip[i], probs[i],
+                                            temp_unit, soil_unit, precip_unit, cur_pressure if i == cur_idx else None)
+                for i in rows]
             if not merged_current:
                 wdata.append(cur_weather)
-            record_weather(wdata)
+            series = record_weather(wdata)
 
             # for previous 12h determine the amount of rain and for next 12 hours probability of rain and amount of rain
-            past_12h_rain = 0.0
-            next_12h_prob = 0.0
-            next_12h_rain = 0.0
-            horizon_from = now - timedelta(hours=12)
-            horizon_to = now + timedelta(hours=12)
-            for w in wdata:
-                if now >= w.timestamp >= horizon_from:
-                    past_12h_rain += w.precipitation_amount.value
-                if horizon_to >= w.timestamp > now:
-                    next_12h_prob = max(next_12h_prob, w.precipitation_prob.value)
-                    next_12h_rain += w.precipitation_amount.value
-            with self._lock:
-                self._last_update = now
-                CONFIG[Settings.WEATHER_LAST_CHECK_TIMESTAMP] = now
+            past_12h_rain, next_12h_prob, next_12h_rain = _aggregate_window(*_split_window(series, now.timestamp()))
+            self._adapt_poll_interval(next_12h_prob)
+            self._publish_update(now)
             result = True
             self._logger.info(f"Current weather conditions @ {current.get('time')} :: Temperature: {current.get('temperature_2m', 0)}"
                 f"{current_units.get('temperature_2m')}, Humidity: {current.get('relative_humidity_2m', 0)}%, Precipitation: {current.get('precipitation', 0)}"
                 f"{current_units.get('precipitation')}, Pressure: {current.get('surface_pressure', 0)}{current_units.get('surface_pressure')}")
-            self._logger.info(f"Weather updated successfully. Previous 12h rain amount: {past_12h_rain:.2f}{hourly_units.get('precipitation')}. "
-                f"Next 12h rain: {next_12h_rain:.2f}{hourly_units.get('precipitation')} with {next_12h_prob:.2f}% chance")
+            self._logger.info(f"Weather updated successfully. Previous 12h rain amount: {past_12h_rain:.2f}{precip_unit}. "
+                f"Next 12h rain: {next_12h_rain:.2f}{precip_unit} with {next_12h_prob:.2f}% chance")
         except Exception as e:
             self._logger.error(f"Failed to update weather data, will retry: {e}", exc_info=True)
             result = False
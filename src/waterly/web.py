@@ -3,21 +3,45 @@
 #  Copyright (c) 2025 by Dan Luca. All rights reserved.
 #
 
-import os
+import gzip
 
 from datetime import datetime
-from flask import Flask, jsonify, request, render_template, send_from_directory, abort
-from werkzeug.exceptions import HTTPException
+from time import monotonic
+from flask import Blueprint, Flask, Response, jsonify, request, render_template, send_from_directory, abort
+from werkzeug.exceptions import HTTPException, MethodNotAllowed, NotFound
 from .queues import send_message_to_scheduler
 from .model.measurement import convert_measurement, convert_measurement_unit_type
 from .model.times import valid_timezone, now_local
 from .model.units import UnitType
 from .config import get_project_root, CONFIG, Settings
-from .storage import db
+from .storage import db, data_version
+
+try:
+    import orjson
+except ImportError:     # optional, faster JSON encoding; fall back to the app's (standard library) JSON provider
+    orjson = None
+
+try:
+    import brotli
+except ImportError:     # optional, smaller responses than gzip for clients accepting Brotli
+    brotli = None
+
+try:
+    from waitress import serve
+except ImportError:     # optional, production WSGI server; fall back to the threaded Werkzeug server
+    serve = None
 
 HTTP_HOST = "0.0.0.0"
 HTTP_PORT = 8080
+HTTP_THREADS = 4
+STATIC_MAX_AGE_SECONDS = 300
+LATEST_SENSORS_TTL_SECONDS = 30
+COMPRESS_LEVEL = 4
+COMPRESS_MIN_SIZE = 500
 app = Flask(__name__, static_url_path="/static", static_folder="static", template_folder="tmpl", root_path=f"{get_project_root()}/web")
+# JSON REST API routes, with their own (JSON) error handling; registered on the app once all its routes are defined
+api = Blueprint("api", __name__, url_prefix="/api")
+_STATIC = app.static_folder
 
 # --------------------------
 # HTML pages (from disk)
@@ -27,11 +51,18 @@ app = Flask(__name__, static_url_path="/static", static_folder="static", templat
 def home():
     # Renders templates/index.html from the templates/ folder
     # return render_template("index.html", title="Home")
-    directory = app.static_folder
-    filename = "index.html"
-    if not os.path.exists(os.path.join(directory, filename)):
-        abort(404)
-    return send_from_directory(directory, filename, mimetype="text/html")
+    return _send_cacheable(_STATIC, "index.html", mimetype="text/html")
+
+
+def _send_cacheable(directory: str, filename: str, mimetype: str) -> Response:
+    """
+    Sends a static file allowing clients to cache it for STATIC_MAX_AGE_SECONDS and to revalidate it afterward with
+    a conditional request (ETag, Last-Modified) - answered with 304 Not Modified while the file is unchanged. A missing
+    file raises NotFound (404).
+    """
+    response = send_from_directory(directory, filename, mimetype=mimetype, max_age=STATIC_MAX_AGE_SECONDS, conditional=True)
+    response.cache_control.must_revalidate = True
+    return response
 
 
 @app.get("/about")
@@ -45,143 +76,222 @@ def serve_raw_page(filename: str):
     # Restrict to .html files only
     if not filename.endswith(".html"):
         abort(404)
-    directory = app.static_folder
-    if not os.path.exists(os.path.join(directory, filename)):
-        abort(404)
-    return send_from_directory(directory, filename)
+    # a missing file raises NotFound (404) from send_from_directory
+    return send_from_directory(_STATIC, filename)
 
 # --------------------------
 # JSON REST API
 # --------------------------
-@app.get("/api/health")
+# constant payloads of the placeholder endpoints, encoded once; a fresh (cheap) Response wraps them on each request, as
+# response objects are mutable and may be altered while being sent
+_HEALTH_JSON = b'{"status":"ok"}'
+_ITEMS_JSON = b'{"items":[]}'
+_ITEM_CREATED_JSON = b'{"id":0,"message":"Unsupported operation"}'
+_ITEM_NOT_FOUND_JSON = b'{"error":"not found"}'
+_ITEM_UPDATED_JSON = b'{"id":%d,"message":"Unsupported operation"}'
+_ITEM_DELETED_JSON = b'{"deleted":%d}'
+
+@api.get("/health")
 def health():
-    return jsonify({"status": "ok"})
+    return Response(_HEALTH_JSON, mimetype="application/json")
 
-@app.get("/api/manifest")
+@api.get("/manifest")
 def manifest():
-    directory = app.static_folder
-    filename = "manifest.json"
-    if not os.path.exists(os.path.join(directory, filename)):
-        abort(404)
-    return send_from_directory(directory, filename, mimetype="application/json")
+    return _send_cacheable(_STATIC, "manifest.json", mimetype="application/json")
 
-@app.get("/api/items")
+@api.get("/items")
 def list_items():
-    return jsonify({"items": []})
+    return Response(_ITEMS_JSON, mimetype="application/json")
 
-@app.post("/api/items")
+@api.post("/items")
 def create_item():
-    return jsonify({"id": 0, "message": "Unsupported operation"}), 201
+    return Response(_ITEM_CREATED_JSON, status=201, mimetype="application/json")
 
-@app.get("/api/items/<int:item_id>")
+@api.get("/items/<int:item_id>")
 def get_item(item_id: int):
-    return jsonify({"error": "not found"}), 404
+    return Response(_ITEM_NOT_FOUND_JSON, status=404, mimetype="application/json")
 
-@app.put("/api/items/<int:item_id>")
+@api.put("/items/<int:item_id>")
 def update_item(item_id: int):
-    return jsonify({"id": item_id, "message": "Unsupported operation"})
+    return Response(_ITEM_UPDATED_JSON % item_id, mimetype="application/json")
 
-@app.delete("/api/items/<int:item_id>")
+@api.delete("/items/<int:item_id>")
 def delete_item(item_id: int):
-    return jsonify({"deleted": item_id})
+    return Response(_ITEM_DELETED_JSON % item_id, mimetype="application/json")
+
+# The latest readings, total water per zone and the +/-12h weather summary, in a single round-trip. Every row has the
+# columns (kind, name, ts_utc, tz, reading, unit, zone name, zone description, precipitation, precipitation unit,
+# precipitation probability), with kind telling the three row types apart:
+#  - _LATEST: the latest reading of a zone and metric - one lookup in idx_measurement_zone_name_ts (newest entry
+#    first), rather than the scan of the whole measurement table v_latest_measurement does for its MAX() per group
+#  - _WATER: the total water of a zone, in reading and unit; the zone name is set, the other columns are NULL
+#  - _WEATHER: the weather of a 12h bucket (and units) - the bucket name (prev12/next12) as name, the minimum
+#    temperature as reading, the maximum temperature as zone name, the total precipitation and the maximum
+#    precipitation probability; current conditions records (without precipitation probability) are excluded
+_LATEST, _WATER, _WEATHER = 0, 1, 2
+_LATEST_SENSORS_SQL = f"""
+    SELECT {_LATEST}, m.name, m.ts_utc, m.tz, m.reading, m.unit, z.name, z.description, NULL, NULL, NULL
+      FROM zone z, (VALUES ('temperature'), ('humidity'), ('ph'), ('rpitemp'), ('water')) n, measurement m
+     WHERE m.id = (SELECT l.id FROM measurement l WHERE l.zone_id = z.id AND l.name = n.column1 ORDER BY l.ts_utc DESC LIMIT 1)
+    UNION ALL
+    SELECT {_WATER}, NULL, NULL, NULL, sum(m.reading), m.unit, z.name, NULL, NULL, NULL, NULL
+      FROM measurement m, zone z
+     WHERE m.name = 'water' AND z.id = m.zone_id
+     GROUP BY m.zone_id, m.unit
+    UNION ALL
+    SELECT {_WEATHER}, CASE WHEN w.forecast_ts_utc > :now THEN 'next12' ELSE 'prev12' END AS bucket, NULL, NULL,
+           min(w.temperature_2m), w.temperature_unit, max(w.temperature_2m), NULL, sum(w.precipitation),
+           w.precipitation_unit, max(w.precipitation_probability)
+      FROM v_weather_12h_window w
+     WHERE w.precipitation_probability IS NOT NULL
+     GROUP BY bucket, w.temperature_unit, w.precipitation_unit
+"""
+
+# (monotonic time, data version, JSON payload, compressed payloads by content encoding) of the last
+# /api/latest/sensors response
+_latest_sensors: tuple[float, int, bytes, dict[str, bytes]] | None = None
 
-@app.get("/api/latest/sensors")
+def invalidate_latest_sensors(*_):
+    """
+    Discards the cached /api/latest/sensors response; the next request rebuilds it. Also registered as a configuration
+    change listener - e.g. a units change converts the readings differently.
+    """
+    global _latest_sensors
+    _latest_sensors = None
+
+CONFIG.add_change_listener(invalidate_latest_sensors)
+
+@api.get("/latest/sensors")
 def get_latest_sensors():
+    global _latest_sensors
+    # the dashboard polls this endpoint; serve the cached payload until new data is recorded or the TTL expires
+    cached = _latest_sensors
+    version = data_version()
+    if cached is None or cached[1] != version or monotonic() - cached[0] > LATEST_SENSORS_TTL_SECONDS:
+        payload = _compute_latest_sensors()
+        cached = _latest_sensors = (monotonic(), version, payload, _compress(payload))
+    for encoding, body in cached[3].items():
+        if request.accept_encodings[encoding]:
+            response = Response(body, mimetype="application/json")
+            response.content_encoding = encoding
+            break
+    else:
+        response = Response(cached[2], mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    return response
+
+def _compress(payload: bytes) -> dict[str, bytes]:
+    """
+    Compresses a response payload once for all the requests it is served to - with Brotli (when installed) and gzip,
+    in the order of preference. Payloads smaller than COMPRESS_MIN_SIZE are not worth compressing.
+
+    :param payload: The response payload.
+    :type payload: bytes
+    :return: The compressed payloads by content encoding; empty for small payloads.
+    :rtype: dict[str, bytes]
+    """
+    if len(payload) < COMPRESS_MIN_SIZE:
+        return {}
+    encoded = {"br": brotli.compress(payload, quality=COMPRESS_LEVEL)} if brotli else {}
+    encoded["gzip"] = gzip.compress(payload, compresslevel=COMPRESS_LEVEL)
+    return encoded
+
+def _compute_latest_sensors() -> bytes:
+    """
+    Builds the /api/latest/sensors response: the latest readings and total water per zone, and the weather summary of
+    the past and next 12 hours.
+
+    :return: The response payload, serialized JSON.
+    :rtype: bytes
+    """
+    now = now_local()
     with db() as conn:
-        cur = conn.cursor()
-        # most recent measurements
-        rows = cur.execute("select m.name, m.ts_utc, m.tz, m.reading, m.unit, z.name, z.description from v_latest_measurement m, "
-                           "zone z where m.name in ('temperature', 'humidity', 'ph', 'rpitemp', 'water') and m.zone_id = z.id").fetchall()
+        rows = conn.execute(_LATEST_SENSORS_SQL, {"now": int(now.timestamp() * 1000)}).fetchall()
         result = {}
-        for name, tutc, tz, reading, unit, zone_name, zone_desc in rows:
-            if zone_name not in result:
-                result[zone_name] = {}
-            result[zone_name]["utc"] = max(int(tutc/1000), result[zone_name].get("utc", 0))
-            time = datetime.fromtimestamp(result[zone_name]["utc"], valid_timezone(tz))
-            result[zone_name]["name"] = zone_name
-            result[zone_name]["desc"] = zone_desc
-            result[zone_name]["ts"] = time.isoformat()
-            result[zone_name]["date"] = time.strftime("%b %d, %Y")
-            result[zone_name]["time"] = time.strftime("%H:%M")
+        latest = [row[1:8] for row in rows if row[0] == _LATEST]
+        waters = [(row[4], row[6], row[5]) for row in rows if row[0] == _WATER]
+        wrows = [(row[1], row[4], row[5], row[6], row[8], row[9], row[10]) for row in rows if row[0] == _WEATHER]
+        # most recent measurements
+        zone_tz = {}
+        for name, tutc, tz, reading, unit, zone_name, zone_desc in latest:
+            zone = result.setdefault(zone_name, {})
+            tzinfo = zone_tz[zone_name] = valid_timezone(tz)
+            zone["utc"] = max(int(tutc/1000), zone.get("utc", 0))
+            zone["name"] = zone_name
+            zone["desc"] = zone_desc
             v, u = convert_measurement_unit_type(reading, unit, CONFIG[Settings.UNITS])
-            result[zone_name][name] = v
-            result[zone_name][f"{name}_unit"] = u
+            zone[name] = v
+            zone[f"{name}_unit"] = u
             if name == "water":
-                result[zone_name]["last_watering"] = datetime.fromtimestamp(tutc/1000, valid_timezone(tz)).strftime("%b %d, %Y")
+                zone["last_watering"] = datetime.fromtimestamp(tutc/1000, tzinfo).strftime("%b %d, %Y")
+        # timestamp of each zone's most recent reading - formatted once per zone, after all its readings are seen
+        for zone_name, tzinfo in zone_tz.items():
+            zone = result[zone_name]
+            time = datetime.fromtimestamp(zone["utc"], tzinfo)
+            zone["ts"] = time.isoformat()
+            zone["date"] = time.strftime("%b %d, %Y")
+            zone["time"] = time.strftime("%H:%M")
         # total water consumed per zone
-        waters = cur.execute("select sum(m.reading), z.name, m.unit from measurement m, zone z where m.name ='water' "
-                             "and z.id=m.zone_id group by m.zone_id, unit").fetchall()
         for w, z, u in waters:
-            if "total_water" not in result[z]:
-                result[z]["total_water"] = 0
+            zone = result.setdefault(z, {})
             v, u = convert_measurement_unit_type(w, u, CONFIG[Settings.UNITS])
-            result[z]["total_water"] += v   # the units are the same as the water reading above
-            if "last_watering" not in result[z]:
-                result[z]["last_watering"] = "n/a"
-        # weather info - exclude items without precipitation probability (current conditions)
-        now = now_local()
-        wrows = cur.execute("select w.forecast_ts_utc, w.tz, w.temperature_2m, w.temperature_unit, w.precipitation, "
-                           "w.precipitation_unit, w.precipitation_probability from v_weather_12h_window w "
-                            "where w.precipitation_probability is not null").fetchall()
+            zone["total_water"] = zone.get("total_water", 0) + v   # the units are the same as the water reading above
+            zone.setdefault("last_watering", "n/a")
+        # weather info - min/max temperature, total rain and max rain probability over the past and next 12 hours
         weather = {"prev12": {}, "next12": {}}
-        for ts, tz, temp, temp_unit, precip, precip_unit, precip_prob in wrows:
-            # find temp min and max for previous 12h and next 12h
-            time = datetime.fromtimestamp(ts/1000.0, valid_timezone(tz))
-            c_temp, c_temp_unit = convert_measurement_unit_type(temp, temp_unit, CONFIG[Settings.UNITS])
+        for bucket, t_min, temp_unit, t_max, precip, precip_unit, precip_prob in wrows:
+            # one row per bucket and units - rows in different units (e.g. after a units change) are merged
+            c_min, c_temp_unit = convert_measurement_unit_type(t_min, temp_unit, CONFIG[Settings.UNITS])
+            c_max, _ = convert_measurement_unit_type(t_max, temp_unit, CONFIG[Settings.UNITS])
             c_precip, c_precip_unit = convert_measurement_unit_type(precip, precip_unit, CONFIG[Settings.UNITS])
-            if now < time:
-                if "temp_min" not in weather["prev12"]:
-                    weather["prev12"]["temp_min"] = c_temp
-                weather["prev12"]["temp_min"] = min(c_temp, weather["prev12"]["temp_min"])
-                if "temp_max" not in weather["prev12"]:
-                    weather["prev12"]["temp_max"] = c_temp
-                weather["prev12"]["temp_max"] = max(c_temp, weather["prev12"]["temp_max"])
-                weather["prev12"]["temp_unit"] = c_temp_unit
-                if "precip" not in weather["prev12"]:
-                    weather["prev12"]["precip"] = 0
-                weather["prev12"]["precip"] += c_precip
-                weather["prev12"]["precip_unit"] = c_precip_unit
-                if "precip_prob" not in weather["prev12"]:
-                    weather["prev12"]["precip_prob"] = precip_prob
-                weather["prev12"]["precip_prob"] = max(precip_prob, weather["prev12"]["precip_prob"])
-            else:
-                if "temp_min" not in weather["next12"]:
-                    weather["next12"]["temp_min"] = c_temp
-                weather["next12"]["temp_min"] = min(c_temp, weather["next12"]["temp_min"])
-                if "temp_max" not in weather["next12"]:
-                    weather["next12"]["temp_max"] = c_temp
-                weather["next12"]["temp_max"] = max(c_temp, weather["next12"]["temp_max"])
-                weather["next12"]["temp_unit"] = c_temp_unit
-                if "precip" not in weather["next12"]:
-                    weather["next12"]["precip"] = 0
-                weather["next12"]["precip"] += c_precip
-                weather["next12"]["precip_unit"] = c_precip_unit
-                if "precip_prob" not in weather["next12"]:
-                    weather["next12"]["precip_prob"] = precip_prob
-                weather["next12"]["precip_prob"] = max(precip_prob, weather["next12"]["precip_prob"])
+            agg = weather[bucket]
+            agg["temp_min"] = min(c_min, agg.get("temp_min", c_min))
+            agg["temp_max"] = max(c_max, agg.get("temp_max", c_max))
+            agg["temp_unit"] = c_temp_unit
+            agg["precip"] = agg.get("precip", 0) + c_precip
+            agg["precip_unit"] = c_precip_unit
+            agg["precip_prob"] = max(precip_prob, agg.get("precip_prob", precip_prob))
         weather["timestamp"] = {"date": now.strftime("%b %d, %Y"), "time": now.strftime("%H:%M"), "utc": now.timestamp()}
         weather["location"] = CONFIG[Settings.LOCATION]
         forecast_time = CONFIG[Settings.WEATHER_LAST_CHECK_TIMESTAMP]
         weather["forecast_time"] = {"date": forecast_time.strftime("%b %d, %Y"), "time": forecast_time.strftime("%H:%M"), "utc": forecast_time.timestamp()}
         result["weather"] = weather
-        return jsonify(result)
+        # keys sorted as the app's JSON provider does - the same document (and key order) with or without orjson; only
+        # whitespace and non-ASCII escaping differ
+        return orjson.dumps(result, option=orjson.OPT_SORT_KEYS) if orjson else app.json.dumps(result).encode()
 
 # --------------------------
 # Error handling
 # - JSON responses for /api/* errors
 # - Default HTML error pages for others
 # --------------------------
-@app.errorhandler(HTTPException)
-def handle_http_exception(e: HTTPException):
+@api.errorhandler(HTTPException)
+def handle_api_http_exception(e: HTTPException):
+    # keep the exception's own headers (e.g. Allow of a 405), but not its HTML content type
+    headers = [(k, v) for k, v in e.get_headers() if k != "Content-Type"]
+    return jsonify({"error": e.name, "message": e.description, "status": e.code}), e.code, headers
+
+@app.errorhandler(NotFound)
+@app.errorhandler(MethodNotAllowed)
+def handle_routing_exception(e: HTTPException):
+    # routing errors are raised before a blueprint is matched - answer the /api/* ones with JSON as well
     if request.path.startswith("/api/"):
-        return jsonify({"error": e.name, "message": e.description, "status": e.code}), e.code
-    # Use default HTML error for non-API routes
+        return handle_api_http_exception(e)
     return e
 
+app.register_blueprint(api)
+
 def create_app():
     return app
 
 def run_app():
-    app.run(host=HTTP_HOST, port=HTTP_PORT, debug=False)
+    """
+    Serves the web app. Each request is handled on a worker thread - a request waiting on SQLite does not hold up
+    the others; the waitress server is used when installed, the Werkzeug development server otherwise.
+    """
+    if serve is not None:
+        serve(app, host=HTTP_HOST, port=HTTP_PORT, threads=HTTP_THREADS)
+    else:
+        app.run(host=HTTP_HOST, port=HTTP_PORT, debug=False, threaded=True)
 
 